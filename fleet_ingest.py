@@ -0,0 +1,186 @@
+"""Merge usage_history.csv files collected from many machines into one SQLite store.
+
+Files are split into line-aligned byte ranges that are parsed in parallel by a process
+pool, so only a bounded number of chunks is held in memory at any time. Samples seen in
+more than one file (for example the same laptop collected twice) are stored once, keyed
+by vessel, username and timestamp. The store is clustered on that key and indexed by
+time, and a consumption report per user and per vessel is printed after ingesting.
+
+    python fleet_ingest.py collected/ --db fleet.sqlite
+
+By default the vessel is the name of the directory containing each file; use
+--vessel-from file to take it from the file name instead.
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    vessel TEXT NOT NULL,
+    username TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    download_mb REAL NOT NULL,
+    upload_mb REAL NOT NULL,
+    total_mb REAL NOT NULL,
+    status TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (vessel, username, timestamp)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_by_time ON samples (timestamp);
+"""
+
+# Overlapping copies of a file may hold the same run at different lengths; keep the longest
+UPSERT = """
+INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (vessel, username, timestamp) DO UPDATE SET
+    samples = max(samples, excluded.samples),
+    last_seen = max(last_seen, excluded.last_seen)
+"""
+
+# Counters are cumulative within a quota period, so consumption is the sum of increases
+# between consecutive samples; a drop means the quota renewed and the new total counts
+CONSUMPTION = """
+SELECT {group}, SUM(CASE
+        WHEN previous IS NULL THEN 0
+        WHEN total_mb >= previous THEN total_mb - previous
+        ELSE total_mb
+    END), SUM(samples), COUNT(DISTINCT username), MIN(timestamp), MAX(last_seen)
+FROM (
+    SELECT vessel, username, timestamp, last_seen, samples, total_mb,
+           LAG(total_mb) OVER (PARTITION BY vessel, username ORDER BY timestamp) AS previous
+    FROM samples
+)
+GROUP BY {group}
+ORDER BY 2 DESC
+"""
+
+
+def find_history_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.lower().endswith(".csv"):
+                        yield os.path.join(directory, name)
+        else:
+            yield path
+
+
+def vessel_name(path, vessel_from):
+    if vessel_from == "file":
+        return os.path.splitext(os.path.basename(path))[0]
+    return os.path.basename(os.path.dirname(os.path.abspath(path)))
+
+
+def split_file(path, chunk_size):
+    """Yield (start, end) byte ranges covering the file"""
+    size = os.path.getsize(path)
+    for start in range(0, size, chunk_size):
+        yield start, min(start + chunk_size, size)
+
+
+def parse_chunk(path, vessel, start, end):
+    """Parse the lines starting inside [start, end) and return (rows, skipped)"""
+    rows = []
+    skipped = 0
+    with open(path, 'rb') as f:
+        if start > 0:
+            # The line that straddles the start belongs to the previous chunk
+            f.seek(start - 1)
+            f.readline()
+        lines = []
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line.decode("utf-8", errors="replace"))
+
+    for row in csv.reader(lines):
+        if not row or row[0] == "Timestamp":
+            continue
+        try:
+            if len(row) not in (6, 8):
+                raise ValueError(f"unexpected column count {len(row)}")
+            datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S")
+            samples = int(row[6]) if len(row) == 8 else 1
+            last_seen = row[7] if len(row) == 8 else row[0]
+            rows.append((vessel, row[1], row[0], float(row[2]), float(row[3]), float(row[4]),
+                         row[5], samples, last_seen))
+        except ValueError:
+            skipped += 1
+    return rows, skipped
+
+
+def ingest(connection, tasks, workers):
+    """Parse the tasks in a process pool and upsert the rows as chunks complete"""
+    inserted = skipped = 0
+    pending = set()
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            # Keep a bounded number of chunks in flight so memory use stays flat
+            while len(pending) < workers * 2:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                pending.add(pool.submit(parse_chunk, *task))
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rows, chunk_skipped = future.result()
+                with connection:
+                    connection.executemany(UPSERT, rows)
+                inserted += len(rows)
+                skipped += chunk_skipped
+    return inserted, skipped
+
+
+def print_report(connection, group, title):
+    print(f"\n{title}")
+    print(f"{group.capitalize():<24} {'Consumed (MB)':>14} {'Samples':>10} {'Users':>6}  Period")
+    for name, consumed, samples, users, first, last in connection.execute(CONSUMPTION.format(group=group)):
+        print(f"{name:<24} {consumed:>14.2f} {samples:>10} {users:>6}  {first} - {last}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge usage_history.csv files from many machines")
+    parser.add_argument("paths", nargs="*", help="history files or directories to search for .csv files")
+    parser.add_argument("--db", default="fleet_history.sqlite", help="SQLite store to create or update")
+    parser.add_argument("--vessel-from", choices=("dir", "file"), default="dir",
+                        help="take the vessel name from the parent directory or the file name")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parser processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=float, default=8, help="size of the byte ranges parsed per task")
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(args.db)
+    connection.executescript(SCHEMA)
+
+    if args.paths:
+        chunk_size = max(1, int(args.chunk_mb * 1024 * 1024))
+        files = list(find_history_files(args.paths))
+        tasks = ((path, vessel_name(path, args.vessel_from), start, end)
+                 for path in files for start, end in split_file(path, chunk_size))
+
+        started = time.perf_counter()
+        inserted, skipped = ingest(connection, tasks, args.workers)
+        total = connection.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+        print(f"Read {inserted} rows from {len(files)} files in {time.perf_counter() - started:.1f}s "
+              f"({skipped} malformed rows skipped); the store now holds {total} unique samples")
+
+    print_report(connection, "vessel", "CONSUMPTION PER VESSEL")
+    print_report(connection, "username", "CONSUMPTION PER USER")
+    connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,26 @@
+import time
+MODULE_START = time.perf_counter()  # Used by --profile-startup to time the imports
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import subprocess
+import asyncio
 import json
+import csv
+import bisect
+import heapq
 from datetime import datetime, timedelta
 import threading
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 import platform
+import random
+import socket
+import ssl
+import urllib.error
+import urllib.parse
+import urllib.request
 import traceback  # Added for better error handling
 if platform.system() == 'Windows':
     from subprocess import CREATE_NO_WINDOW
@@ -23,6 +37,528 @@ COLORS = {
     "error": "#F44336"          # Red for errors
 }
 
+PORTAL_URL = "https://internet.stenaline.com/portal_api.php"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+HISTORY_HEADER = "Timestamp,Username,Download (MB),Upload (MB),Total (MB),Status,Samples,Last Seen"
+LEGACY_HISTORY_HEADER = "Timestamp,Username,Download (MB),Upload (MB),Total (MB),Status"
+HISTORY_INDEX_INTERVAL = 256  # Rows between entries of the usage_history.csv.idx sidecar
+HISTORY_REWRITE_LIMIT = 65536  # Most bytes moved to extend a run that is not the last row
+
+# Response fields that identify the user and are removed from captured responses
+REDACTED_KEYS = {"login", "username", "password", "email", "firstname", "lastname", "name", "phone",
+                 "mac", "macaddress", "ip", "ipaddress", "token", "sessionid", "id"}
+
+class StartupProfiler:
+    """Records how long each startup phase takes, printed with --profile-startup"""
+    def __init__(self, start=None, verbose=False):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []
+        self.verbose = verbose
+    
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+    
+    def finish(self):
+        if not self.verbose:
+            return
+        print("Startup profile:")
+        for phase, duration in self.phases:
+            print(f"  {phase:<18} {duration * 1000:8.1f} ms")
+        print(f"  {'total':<18} {(self.last - self.start) * 1000:8.1f} ms")
+
+class TransportError(Exception):
+    """Raised when a transport cannot complete a request.
+    
+    sent is False only when the request certainly never reached the server (no curl, host
+    not found, connection refused), which makes it safe to try another transport.
+    """
+    def __init__(self, message, details=None, status_message="Error: Request failed", sent=True):
+        super().__init__(message)
+        self.message = message
+        self.details = details
+        self.status_message = status_message
+        self.sent = sent
+
+class CurlTransport:
+    """Posts requests by running a curl executable as an asyncio subprocess"""
+    def __init__(self, name, executable):
+        self.name = name
+        self.executable = executable
+    
+    async def post(self, url, body, timeout):
+        curl_command = [
+            self.executable,
+            "-k",   # Skip certificate validation
+            "-s",   # Silent mode
+            "--max-time", str(timeout),
+            "-X", "POST",
+            url,
+            "-H", "Content-Type: application/x-www-form-urlencoded",
+            "-H", f"User-Agent: {USER_AGENT}",
+            "-d", body
+        ]
+        
+        try:
+            # Hide the console window on Windows
+            if platform.system() == 'Windows':
+                process = await asyncio.create_subprocess_exec(
+                    *curl_command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                    creationflags=CREATE_NO_WINDOW
+                )
+            else:
+                process = await asyncio.create_subprocess_exec(
+                    *curl_command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+                )
+        except FileNotFoundError:
+            raise TransportError(
+                f"CURL command not found ({self.executable}). Make sure curl is installed and in your PATH.",
+                status_message="Error: CURL not found",
+                sent=False
+            )
+        
+        try:
+            # curl enforces the timeout itself; this only guards against a hung process
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout + 5)
+        except asyncio.TimeoutError:
+            process.kill()
+            raise TransportError(f"Curl command timed out after {timeout} seconds", status_message="Error: Request timed out")
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        
+        stdout = stdout.decode("utf-8", errors="replace")
+        stderr = stderr.decode("utf-8", errors="replace")
+        if process.returncode != 0 or not stdout:
+            raise TransportError(
+                f"Curl command failed with exit code: {process.returncode}",
+                f"STDERR: {stderr}\n\nSTDOUT: {stdout}",
+                # 6: host not resolved, 7: could not connect
+                sent=process.returncode not in (6, 7)
+            )
+        return stdout
+
+class HttpTransport:
+    """Posts requests with Python's urllib, each on its own daemon thread so the loop stays free.
+    
+    Unlike curl, a blocking urllib call cannot be interrupted: every request in flight costs
+    an OS thread until it completes or times out. A cancelled request therefore keeps its
+    AsyncFetchCore slot until its thread ends, so max_concurrent still bounds the threads.
+    The threads are daemons, so a request left running never delays the program's exit.
+    """
+    name = "built-in http"
+    
+    def __init__(self):
+        # Match curl -k: the captive portal certificate is not validated
+        self.context = ssl.create_default_context()
+        self.context.check_hostname = False
+        self.context.verify_mode = ssl.CERT_NONE
+    
+    async def post(self, url, body, timeout):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def finish(result, error):
+            if not future.done():
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+        
+        def run():
+            try:
+                result, error = self._post(url, body, timeout), None
+            except Exception as e:
+                result, error = None, e
+            try:
+                loop.call_soon_threadsafe(finish, result, error)
+            except RuntimeError:
+                pass  # The loop was closed while the request ran
+        
+        threading.Thread(target=run, name="http-transport", daemon=True).start()
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Hold the caller's slot until the thread is done; a second cancel (shutdown) stops waiting
+            await asyncio.wait([future])
+            if not future.cancelled():
+                future.exception()  # Retrieved, so it is not logged as unhandled
+            raise
+    
+    def _post(self, url, body, timeout):
+        request = urllib.request.Request(url, data=body.encode(), method="POST", headers={
+            "Content-Type": "application/x-www-form-urlencoded",
+            "User-Agent": USER_AGENT
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=timeout, context=self.context) as response:
+                charset = response.headers.get_content_charset() or "utf-8"
+                content = response.read()
+        except urllib.error.HTTPError as e:
+            # Like curl without --fail, a body is returned whatever the status, so both transports
+            # report a portal error the same way and classify_response decides what it means
+            charset = e.headers.get_content_charset() or "utf-8"
+            content = e.read()
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            reason = e.reason if isinstance(e, urllib.error.URLError) else e
+            if isinstance(reason, socket.timeout):
+                raise TransportError(f"HTTP request timed out after {timeout} seconds", status_message="Error: Request timed out")
+            # Name resolution and connection errors happen before anything is sent
+            raise TransportError(f"HTTP request failed: {reason}", traceback.format_exc(),
+                                 sent=not isinstance(reason, (socket.gaierror, ConnectionRefusedError)))
+        
+        if not content:
+            raise TransportError("HTTP request returned an empty response")
+        return content.decode(charset, errors="replace")
+
+class TransportSelector:
+    """Routes requests to the fastest healthy transport.
+    
+    Keeps an exponentially weighted latency and error rate per transport. After a small
+    share of requests one of the other transports is timed with a separate background
+    probe, so its score stays current as satellite conditions change. A request only falls
+    back to the next transport when it never reached the server, so a login is never sent
+    twice.
+    """
+    def __init__(self, transports, probe_rate=0.1, smoothing=0.3):
+        self.transports = transports
+        self.probe_rate = probe_rate
+        self.smoothing = smoothing
+        self.stats = {transport.name: {'latency': None, 'error_rate': 0.0, 'requests': 0} for transport in transports}
+        self.lock = threading.Lock()
+        self.probe_task = None
+    
+    def _score(self, transport):
+        stats = self.stats[transport.name]
+        unhealthy = stats['error_rate'] > 0.5
+        # Untried transports sort first, in order of preference, so they get measured
+        if stats['latency'] is None:
+            return (unhealthy, 0.0 if stats['requests'] == 0 else float('inf'))
+        return (unhealthy, stats['latency'] * (1 + 4 * stats['error_rate']))
+    
+    def ranked(self):
+        """Transports ordered best first"""
+        with self.lock:
+            return sorted(self.transports, key=self._score)
+    
+    def record(self, transport, latency, success):
+        with self.lock:
+            stats = self.stats[transport.name]
+            stats['requests'] += 1
+            stats['error_rate'] += self.smoothing * ((0.0 if success else 1.0) - stats['error_rate'])
+            if success:
+                if stats['latency'] is None:
+                    stats['latency'] = latency
+                else:
+                    stats['latency'] += self.smoothing * (latency - stats['latency'])
+    
+    async def post(self, url, body, timeout=30):
+        """Send a request, returning (transport name, response body)"""
+        failures = []
+        for transport in self.ranked():
+            start = time.perf_counter()
+            try:
+                response = await transport.post(url, body, timeout)
+            except TransportError as e:
+                self.record(transport, time.perf_counter() - start, False)
+                failures.append((transport, e))
+                if e.sent:
+                    break
+                continue
+            self.record(transport, time.perf_counter() - start, True)
+            self._maybe_probe(transport, url, timeout)
+            return transport.name, response
+        
+        # Report the failure of the preferred transport, with every attempt in the details
+        first_error = failures[0][1]
+        details = "\n\n".join(f"[{transport.name}] {e.message}\n{e.details or ''}".strip() for transport, e in failures)
+        raise TransportError(first_error.message, details, first_error.status_message)
+
+    def _maybe_probe(self, used, url, timeout):
+        """Occasionally time another transport in the background; never delays the caller"""
+        others = [transport for transport in self.transports if transport is not used]
+        if not others or self.probe_task is not None or random.random() >= self.probe_rate:
+            return
+        self.probe_task = asyncio.get_running_loop().create_task(self._probe(random.choice(others), url, timeout))
+    
+    async def _probe(self, transport, url, timeout):
+        # An empty form carries no credentials, so the round trip is measured without logging in
+        start = time.perf_counter()
+        try:
+            await transport.post(url, "", timeout)
+            success = True
+        except TransportError:
+            success = False
+        finally:
+            self.probe_task = None
+        self.record(transport, time.perf_counter() - start, success)
+
+class FetchQueueFull(Exception):
+    """Raised by AsyncFetchCore.submit when too many requests are already waiting"""
+
+class AsyncFetchCore:
+    """Runs all network I/O on a single asyncio event loop in one background thread.
+    
+    submit() is called from the Tk thread and returns a concurrent.futures.Future that
+    can be cancelled, which cancels the request (and kills its curl process; a built-in
+    HTTP request keeps its slot until its thread ends). At most max_concurrent requests
+    run at once and the rest wait their turn; once max_pending requests are in the
+    system, submit() refuses new ones. Coroutines never touch
+    widgets: they hand results to Tk with StenaInternetMonitor.call_in_ui, and they
+    write files with write(), which runs every write in order on one writer thread.
+    """
+    def __init__(self, max_concurrent=8, max_pending=256):
+        self.max_pending = max_pending
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fetch-writer")
+        
+        # The semaphore has to be created on the loop's own thread
+        ready = threading.Event()
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.semaphore = asyncio.Semaphore(max_concurrent)
+            ready.set()
+            self.loop.run_forever()
+        self.thread = threading.Thread(target=run, name="fetch-loop", daemon=True)
+        self.thread.start()
+        ready.wait()
+    
+    def submit(self, coroutine_function, *args):
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise FetchQueueFull(f"Too many requests in progress ({self.pending}). Please wait and try again.")
+            self.pending += 1
+        
+        future = asyncio.run_coroutine_threadsafe(self._limited(coroutine_function, args), self.loop)
+        future.add_done_callback(self._release)
+        return future
+    
+    async def _limited(self, coroutine_function, args):
+        # The coroutine is only created once it may run, so cancelling a queued request is free
+        async with self.semaphore:
+            return await coroutine_function(*args)
+    
+    async def write(self, function, *args):
+        """Run a blocking file write off the loop, after any writes queued before it"""
+        return await self.loop.run_in_executor(self.writer, function, *args)
+    
+    def _release(self, future):
+        with self.lock:
+            self.pending -= 1
+    
+    def shutdown(self, timeout=2):
+        """Cancel every outstanding request and stop the loop"""
+        async def cancel_all():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            # Cancelled built-in HTTP requests wait for their threads; a second cancel stops that
+            await asyncio.sleep(0)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_all(), self.loop).result(timeout)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        # Let queued writes finish so the state cache is not lost on exit
+        self.writer.shutdown(wait=True)
+
+def build_transports():
+    """Transports in order of preference: bundled curl, system curl, then the built-in HTTP client"""
+    transports = []
+    if getattr(sys, 'frozen', False):
+        if platform.system() == 'Windows':
+            transports.append(CurlTransport("bundled curl", resource_path(os.path.join("bin", "curl.exe"))))
+        else:
+            transports.append(CurlTransport("bundled curl", resource_path(os.path.join("bin", "curl"))))
+    transports.append(CurlTransport("system curl", "curl"))
+    transports.append(HttpTransport())
+    return transports
+
+class QuotaPercentRule:
+    """Fires when the share of the traffic quota used reaches a threshold"""
+    def __init__(self, threshold=80, hysteresis_percent=5):
+        self.threshold = threshold
+        self.hysteresis = hysteresis_percent / 100
+    
+    def update(self, snapshot):
+        """Return (condition, message); condition is None when the state should not change"""
+        if not snapshot['quota'] or snapshot['available'] is None:
+            return None, None
+        
+        percent = (snapshot['quota'] - snapshot['available']) / snapshot['quota'] * 100
+        if percent >= self.threshold:
+            return True, f"{percent:.1f}% of your internet quota has been used"
+        if percent < self.threshold * (1 - self.hysteresis):
+            return False, None
+        return None, None
+
+class BurnRateRule:
+    """Fires when consumption over a sliding time window exceeds a rate in MB per hour"""
+    def __init__(self, window_minutes=60, threshold_mb_per_hour=500, hysteresis_percent=20):
+        self.window = window_minutes * 60
+        self.threshold = threshold_mb_per_hour
+        self.hysteresis = hysteresis_percent / 100
+        self.samples = deque()
+    
+    def update(self, snapshot):
+        timestamp, used = snapshot['timestamp'], snapshot['used']
+        
+        # Consumption dropping means the quota was renewed
+        if self.samples and used < self.samples[-1][1]:
+            self.samples.clear()
+        self.samples.append((timestamp, used))
+        
+        # Keep a single sample at or before the start of the window
+        while len(self.samples) > 2 and self.samples[1][0] <= timestamp - self.window:
+            self.samples.popleft()
+        
+        first_timestamp, first_used = self.samples[0]
+        if timestamp <= first_timestamp:
+            return None, None
+        
+        rate = (used - first_used) / (timestamp - first_timestamp) * 3600 / (1024 * 1024)
+        if rate >= self.threshold:
+            return True, f"Internet usage is running at {rate:.0f} MB per hour"
+        if rate < self.threshold * (1 - self.hysteresis):
+            return False, None
+        return None, None
+
+class ExhaustionRule:
+    """Fires when the quota will run out before it renews at the current burn rate"""
+    def __init__(self, margin_hours=0, smoothing=0.3, hysteresis_percent=10):
+        self.margin = margin_hours * 3600
+        self.smoothing = smoothing
+        self.hysteresis = hysteresis_percent / 100
+        self.last = None
+        self.rate = None
+    
+    def update(self, snapshot):
+        timestamp, used = snapshot['timestamp'], snapshot['used']
+        
+        if self.last is not None:
+            last_timestamp, last_used = self.last
+            if used < last_used:
+                # Quota renewed, start measuring again
+                self.rate = None
+            elif timestamp > last_timestamp:
+                rate = (used - last_used) / (timestamp - last_timestamp)
+                self.rate = rate if self.rate is None else self.rate + self.smoothing * (rate - self.rate)
+        self.last = (timestamp, used)
+        
+        # Once the quota is used up there is nothing left to forecast
+        if snapshot['quota_reached']:
+            return None, None
+        
+        time_to_renewal = snapshot['renew_timestamp'] - timestamp
+        if self.rate is None or snapshot['available'] is None or time_to_renewal <= 0:
+            return None, None
+        if self.rate <= 0:
+            return False, None
+        
+        time_to_exhaustion = snapshot['available'] / self.rate
+        if time_to_exhaustion < time_to_renewal - self.margin:
+            return True, (f"At the current rate your quota runs out in {time_to_exhaustion / 3600:.1f} hours, "
+                          f"but it only renews in {time_to_renewal / 3600:.1f} hours")
+        if time_to_exhaustion > (time_to_renewal - self.margin) * (1 + self.hysteresis):
+            return False, None
+        return None, None
+
+ALERT_RULE_TYPES = {
+    "quota_percent": QuotaPercentRule,
+    "burn_rate": BurnRateRule,
+    "exhaustion": ExhaustionRule
+}
+
+# Used for profiles without an "alerts" entry in profiles.json
+DEFAULT_ALERT_RULES = [
+    {"type": "quota_percent", "threshold": 80},
+    {"type": "exhaustion", "margin_hours": 1}
+]
+
+class AlertEngine:
+    """Evaluates a profile's alert rules incrementally as new snapshots arrive.
+    
+    Each rule keeps its own running aggregates, so an update costs O(1) per rule. A rule
+    only notifies when it becomes active, at most once per cooldown, and it has to clear
+    past its hysteresis band before it can become active again. Every rule takes that band
+    as hysteresis_percent, a percentage of its own threshold.
+    """
+    def __init__(self, rules, cooldown_seconds=1800):
+        self.rules = rules
+        self.cooldown = cooldown_seconds
+        self.active = [False] * len(rules)
+        self.last_notified = [None] * len(rules)
+    
+    @classmethod
+    def from_profile(cls, profile):
+        rules = []
+        for config in profile.get('alerts', DEFAULT_ALERT_RULES):
+            rule_type = config.get('type')
+            if rule_type not in ALERT_RULE_TYPES:
+                raise ValueError(f"Unknown alert rule type: {rule_type!r}")
+            if 'hysteresis' in config:
+                raise ValueError(f"The {rule_type} alert rule takes hysteresis_percent, a percentage of its threshold")
+            hysteresis = config.get('hysteresis_percent', 0)
+            if not isinstance(hysteresis, (int, float)) or not 0 <= hysteresis < 100:
+                raise ValueError(f"hysteresis_percent of the {rule_type} alert rule must be from 0 to below 100")
+            options = {key: value for key, value in config.items() if key != 'type'}
+            rules.append(ALERT_RULE_TYPES[rule_type](**options))
+        return cls(rules, profile.get('alert_cooldown_minutes', 30) * 60)
+    
+    def update(self, snapshot):
+        """Feed a snapshot to every rule and return the messages that should be shown"""
+        messages = []
+        now = time.monotonic()
+        for index, rule in enumerate(self.rules):
+            condition, message = rule.update(snapshot)
+            if condition is None:
+                continue
+            if condition and not self.active[index]:
+                last = self.last_notified[index]
+                if last is None or now - last >= self.cooldown:
+                    self.last_notified[index] = now
+                    messages.append(message)
+            self.active[index] = condition
+        return messages
+
+class AlertNotification:
+    """A small always-on-top window in the corner of the screen that closes itself"""
+    open_count = 0
+    
+    def __init__(self, root, message, duration=10000):
+        self.window = tk.Toplevel(root)
+        self.window.wm_overrideredirect(True)
+        self.window.attributes("-topmost", True)
+        self.window.configure(bg=COLORS["warning"])
+        
+        label = tk.Label(self.window, text=message, background=COLORS["warning"], foreground="white",
+                         font=("Segoe UI", 10, "bold"), wraplength=300, justify=tk.LEFT, padx=12, pady=10)
+        label.pack()
+        label.bind("<Button-1>", self.close)
+        
+        # Stack notifications upwards from the bottom-right corner
+        self.window.update_idletasks()
+        x = self.window.winfo_screenwidth() - self.window.winfo_reqwidth() - 20
+        y = self.window.winfo_screenheight() - (self.window.winfo_reqheight() + 10) * (AlertNotification.open_count + 1) - 50
+        self.window.wm_geometry(f"+{x}+{y}")
+        AlertNotification.open_count += 1
+        self.window.after(duration, self.close)
+    
+    def close(self, event=None):
+        if self.window:
+            self.window.destroy()
+            self.window = None
+            AlertNotification.open_count -= 1
+
 class ModernTooltip:
     def __init__(self, widget, text):
         self.widget = widget
@@ -98,13 +634,17 @@ class CustomButton(tk.Canvas):
             self.command()
 
 class StenaInternetMonitor:
-    def __init__(self, root):
+    def __init__(self, root, profiler=None, capture_path=None):
         self.root = root
+        self.profiler = profiler or StartupProfiler()
         self.root.title("KERRY the FERRY Internet Monitor")
         self.root.geometry("550x800")
         self.root.resizable(True, True)
         self.root.configure(bg=COLORS["background"])
         
+        # Results from the fetch event loop are handed to the Tk main loop through this queue
+        self.ui_queue = queue.Queue()
+        
         # Configure style for Windows modern look
         self.style = ttk.Style()
         self.style.theme_use('clam')  # Use clam theme for better color customization
@@ -117,6 +657,33 @@ class StenaInternetMonitor:
         self.style.configure("TEntry", fieldbackground="white", foreground=COLORS["text"])
         self.style.map("TButton", background=[("active", COLORS["primary"])], foreground=[("active", "white")])
         self.style.configure("Link.TLabel", background=COLORS["background"], foreground=COLORS["primary"], font=("Segoe UI", 8, "underline"))
+        self.profiler.mark("style")
+        
+        # State shared by the first-paint widgets and the deferred panels
+        self.username_var = tk.StringVar(value="")
+        self.password_var = tk.StringVar(value="")
+        self.profile_var = tk.StringVar()
+        self.profile_name_var = tk.StringVar()
+        self.profiles = self.load_profiles()
+        
+        # Storage for fetched data
+        self.current_data = None
+        self.showing_cached = False
+        # Set before the startup refresh so its response is captured too
+        self.capture_path = capture_path
+        self.first_painted = False
+        self.secondary_built = False
+        self.alert_engines = {}
+        
+        # Fetches are routed to whichever HTTP backend is currently performing best,
+        # all on one background event loop
+        self.transport_selector = TransportSelector(build_transports())
+        self.fetch_core = AsyncFetchCore()
+        self.active_fetches = {}
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        
+        # Start refreshing the last used profile while the widgets are being built
+        cached_snapshot = self.start_startup_refresh()
         
         # Create main frame with padding
         self.main_frame = ttk.Frame(root, padding="10 10 10 10")
@@ -130,87 +697,19 @@ class StenaInternetMonitor:
         self.footer_frame = ttk.Frame(self.main_frame)
         self.footer_frame.pack(fill=tk.X, side=tk.BOTTOM, before=self.content_frame)
         
-        # Add GitHub link to footer
-        self.github_link = tk.Label(
-            self.footer_frame,
-            text="© Damiasroca",
-            fg=COLORS["primary"],
-            bg=COLORS["background"],
-            cursor="hand2",
-            font=("Segoe UI", 8, "underline")
-        )
-        self.github_link.pack(side=tk.RIGHT, padx=10, pady=2)
-        self.github_link.bind("<Button-1>", self.open_github)
-        
-        # Info banner about username/password
-        self.info_frame = ttk.Frame(self.content_frame)
-        self.info_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-        self.info_label = ttk.Label(
-            self.info_frame, 
-            text="Note: For Stena Line captive portal, the username and password are the same.",
-            foreground=COLORS["primary"],
-            font=("Segoe UI", 10, "italic")
-        )
-        self.info_label.pack(pady=5)
-        
         # Create credentials frame
         self.creds_frame = ttk.LabelFrame(self.content_frame, text="Login Credentials", padding="5 5 5 5")
         self.creds_frame.pack(fill=tk.X, padx=5, pady=5)
         
         # Create username and password fields
         ttk.Label(self.creds_frame, text="Username:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
-        self.username_var = tk.StringVar(value="")
         self.username_entry = ttk.Entry(self.creds_frame, textvariable=self.username_var, width=20)
         self.username_entry.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
         
         ttk.Label(self.creds_frame, text="Password:").grid(row=0, column=2, sticky=tk.W, padx=5, pady=5)
-        self.password_var = tk.StringVar(value="")
         self.password_entry = ttk.Entry(self.creds_frame, textvariable=self.password_var, show="*", width=20)
         self.password_entry.grid(row=0, column=3, sticky=tk.W, padx=5, pady=5)
         
-        # Create profile management
-        self.profile_frame = ttk.LabelFrame(self.content_frame, text="Profile Management", padding="5 5 5 5")
-        self.profile_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-        # Profile selection
-        self.profiles_frame = ttk.Frame(self.profile_frame)
-        self.profiles_frame.pack(fill=tk.X, pady=5)
-        
-        ttk.Label(self.profiles_frame, text="Select Profile:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
-        self.profiles = self.load_profiles()
-        self.profile_var = tk.StringVar()
-        self.profile_combo = ttk.Combobox(self.profiles_frame, textvariable=self.profile_var, width=20)
-        self.profile_combo.grid(row=0, column=1, padx=5, pady=5)
-        self.update_profile_list()
-        
-        self.profile_combo.bind("<<ComboboxSelected>>", self.load_selected_profile)
-        
-        # New profile creation
-        self.new_profile_frame = ttk.Frame(self.profile_frame)
-        self.new_profile_frame.pack(fill=tk.X, pady=5)
-        
-        ttk.Label(self.new_profile_frame, text="New Profile:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
-        self.profile_name_var = tk.StringVar()
-        self.profile_name_entry = ttk.Entry(self.new_profile_frame, textvariable=self.profile_name_var, width=20)
-        self.profile_name_entry.grid(row=0, column=1, padx=5, pady=5)
-        
-        # Buttons for profile management
-        self.profile_buttons_frame = ttk.Frame(self.new_profile_frame)
-        self.profile_buttons_frame.grid(row=0, column=2, columnspan=2, padx=5, pady=5, sticky=tk.W)
-        
-        self.save_profile_btn = CustomButton(
-            self.profile_buttons_frame, "Save Profile", self.save_profile, 
-            width=100, height=28, bg_color=COLORS["secondary"]
-        )
-        self.save_profile_btn.pack(side=tk.LEFT, padx=5)
-        
-        self.delete_profile_btn = CustomButton(
-            self.profile_buttons_frame, "Delete Profile", self.delete_profile, 
-            width=100, height=28, bg_color=COLORS["warning"]
-        )
-        self.delete_profile_btn.pack(side=tk.LEFT, padx=5)
-        
         # Create action buttons frame
         self.buttons_frame = ttk.Frame(self.content_frame)
         self.buttons_frame.pack(fill=tk.X, padx=5, pady=10)
@@ -234,11 +733,6 @@ class StenaInternetMonitor:
         )
         self.clear_btn.pack(side=tk.LEFT, padx=10)
         
-        # Add tooltips to buttons
-        ModernTooltip(self.fetch_btn, "Fetch your current internet usage data")
-        ModernTooltip(self.save_btn, "Save current usage data to history file")
-        ModernTooltip(self.clear_btn, "Clear the display area")
-        
         # Create output text area
         self.output_frame = ttk.LabelFrame(self.content_frame, text="Internet Usage Information", padding="5 5 5 5")
         self.output_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -269,12 +763,114 @@ class StenaInternetMonitor:
         self.status_var = tk.StringVar(value="Ready")
         self.status_label = ttk.Label(self.status_frame, textvariable=self.status_var, anchor=tk.W)
         self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.profiler.mark("widgets")
         
-        # Storage for fetched data
-        self.current_data = None
+        # Show the last known state straight away, or the welcome message
+        self.restore_cached_state(cached_snapshot)
+        
+        # Profile management, tooltips and the footer are built once the window is on screen
+        self.root.bind("<Map>", self._on_first_map, add="+")
+        self._process_ui_queue()
+    
+    def _on_first_map(self, event):
+        if event.widget is not self.root or self.first_painted:
+            return
+        self.first_painted = True
+        self.root.update_idletasks()
+        self.profiler.mark("first paint")
+        self.root.after(1, self.build_secondary_panels)
+    
+    def build_secondary_panels(self):
+        """Build the panels that are not needed for the first paint"""
+        if self.secondary_built:
+            return
+        self.secondary_built = True
+        
+        # Add GitHub link to footer
+        self.github_link = tk.Label(
+            self.footer_frame,
+            text="© Damiasroca",
+            fg=COLORS["primary"],
+            bg=COLORS["background"],
+            cursor="hand2",
+            font=("Segoe UI", 8, "underline")
+        )
+        self.github_link.pack(side=tk.RIGHT, padx=10, pady=2)
+        self.github_link.bind("<Button-1>", self.open_github)
+        
+        # Info banner about username/password
+        self.info_frame = ttk.Frame(self.content_frame)
+        self.info_frame.pack(fill=tk.X, padx=5, pady=5, before=self.creds_frame)
+        
+        self.info_label = ttk.Label(
+            self.info_frame, 
+            text="Note: For Stena Line captive portal, the username and password are the same.",
+            foreground=COLORS["primary"],
+            font=("Segoe UI", 10, "italic")
+        )
+        self.info_label.pack(pady=5)
+        
+        # Create profile management
+        self.profile_frame = ttk.LabelFrame(self.content_frame, text="Profile Management", padding="5 5 5 5")
+        self.profile_frame.pack(fill=tk.X, padx=5, pady=5, after=self.creds_frame)
+        
+        # Profile selection
+        self.profiles_frame = ttk.Frame(self.profile_frame)
+        self.profiles_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(self.profiles_frame, text="Select Profile:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.profile_combo = ttk.Combobox(self.profiles_frame, textvariable=self.profile_var, width=20)
+        self.profile_combo.grid(row=0, column=1, padx=5, pady=5)
+        self.update_profile_list()
+        
+        self.profile_combo.bind("<<ComboboxSelected>>", self.load_selected_profile)
+        
+        # New profile creation
+        self.new_profile_frame = ttk.Frame(self.profile_frame)
+        self.new_profile_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(self.new_profile_frame, text="New Profile:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.profile_name_entry = ttk.Entry(self.new_profile_frame, textvariable=self.profile_name_var, width=20)
+        self.profile_name_entry.grid(row=0, column=1, padx=5, pady=5)
         
-        # Welcome message with colors
-        self.display_welcome_message()
+        # Buttons for profile management
+        self.profile_buttons_frame = ttk.Frame(self.new_profile_frame)
+        self.profile_buttons_frame.grid(row=0, column=2, columnspan=2, padx=5, pady=5, sticky=tk.W)
+        
+        self.save_profile_btn = CustomButton(
+            self.profile_buttons_frame, "Save Profile", self.save_profile, 
+            width=100, height=28, bg_color=COLORS["secondary"]
+        )
+        self.save_profile_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.delete_profile_btn = CustomButton(
+            self.profile_buttons_frame, "Delete Profile", self.delete_profile, 
+            width=100, height=28, bg_color=COLORS["warning"]
+        )
+        self.delete_profile_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Add tooltips to buttons
+        ModernTooltip(self.fetch_btn, "Fetch your current internet usage data")
+        ModernTooltip(self.save_btn, "Save current usage data to history file")
+        ModernTooltip(self.clear_btn, "Clear the display area")
+        
+        self.profiler.mark("secondary panels")
+        self.profiler.finish()
+    
+    def call_in_ui(self, callback):
+        """Run a callback on the Tk main loop; safe to call from any thread"""
+        self.ui_queue.put(callback)
+    
+    def _process_ui_queue(self):
+        try:
+            while True:
+                try:
+                    callback = self.ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                callback()
+        finally:
+            self.root.after(50, self._process_ui_queue)
     
     def open_github(self, event=None):
         """Open the GitHub profile in the default web browser"""
@@ -314,8 +910,9 @@ class StenaInternetMonitor:
                     return json.load(f)
             return {}
         except Exception as e:
+            error_message = f"Failed to load profiles: {e}"
             error_details = traceback.format_exc()
-            self.root.after(0, lambda: self.display_error(f"Failed to load profiles: {e}", error_details))
+            self.call_in_ui(lambda: self.display_error(error_message, error_details))
             return {}
     
     def save_profiles(self):
@@ -327,6 +924,9 @@ class StenaInternetMonitor:
             self.display_error(f"Failed to save profiles: {e}", error_details)
     
     def update_profile_list(self):
+        if not self.secondary_built:
+            return
+        
         try:
             self.profile_combo['values'] = list(self.profiles.keys())
         except Exception as e:
@@ -352,10 +952,12 @@ class StenaInternetMonitor:
                 messagebox.showerror("Error", "Profile name cannot be empty")
                 return
             
-            self.profiles[profile_name] = {
-                'username': self.username_var.get(),
-                'password': self.password_var.get()
-            }
+            # Keep any other settings stored with the profile, such as alert rules
+            profile = self.profiles.get(profile_name, {})
+            profile['username'] = self.username_var.get()
+            profile['password'] = self.password_var.get()
+            self.profiles[profile_name] = profile
+            self.alert_engines.pop(profile_name, None)
             self.save_profiles()
             self.update_profile_list()
             self.profile_var.set(profile_name)
@@ -393,8 +995,18 @@ class StenaInternetMonitor:
             self.status_indicator.itemconfig(self.status_light, fill=COLORS["primary"])
     
     def fetch_data(self):
+        # Get credentials
+        username = self.username_var.get()
+        password = self.password_var.get()
+        
+        if not username or not password:
+            messagebox.showerror("Error", "Username and password are required")
+            self.set_status("Error: Missing credentials", "error")
+            return
+        
         # Disable the button during fetch
         self.fetch_btn.configure(state=tk.DISABLED)
+        self.showing_cached = False
         self.set_status("Fetching data... Please wait.", "info")
         
         # Clear previous output and show fetching message
@@ -402,123 +1014,234 @@ class StenaInternetMonitor:
         self.output_text.tag_configure("fetching", foreground=COLORS["primary"], font=("Segoe UI", 10, "italic"))
         self.output_text.insert(tk.END, "Fetching data... Please wait.\n", "fetching")
         
-        # Start a new thread to fetch data
-        threading.Thread(target=self._fetch_data_thread, daemon=True).start()
+        self._start_fetch(username, password, self.get_cache_key())
     
-    def _fetch_data_thread(self):
+    def _start_fetch(self, username, password, cache_key):
+        # A new fetch for the same profile replaces one that is still running
+        previous = self.active_fetches.pop(cache_key, None)
+        if previous:
+            previous.cancel()
+        
         try:
-            # Get credentials
-            username = self.username_var.get()
-            password = self.password_var.get()
-        
-            if not username or not password:
-                self.root.after(0, lambda: messagebox.showerror("Error", "Username and password are required"))
-                self.root.after(0, lambda: self.set_status("Error: Missing credentials", "error"))
-                self.root.after(0, lambda: self.fetch_btn.configure(state=tk.NORMAL))
+            future = self.fetch_core.submit(self._fetch, username, password, cache_key)
+        except FetchQueueFull as e:
+            error_message = str(e)
+            self.call_in_ui(lambda: self._report_fetch_error(error_message, status_message="Error: Too many requests"))
+            self.call_in_ui(self._update_fetch_button)
+            return
+        
+        self.active_fetches[cache_key] = future
+        future.add_done_callback(lambda finished: self.call_in_ui(lambda: self._fetch_finished(cache_key, finished)))
+    
+    def _fetch_finished(self, cache_key, future):
+        if self.active_fetches.get(cache_key) is future:
+            del self.active_fetches[cache_key]
+        self._update_fetch_button()
+    
+    def _update_fetch_button(self):
+        # Re-enable the button once no fetch is outstanding
+        if not self.active_fetches:
+            self.fetch_btn.configure(state=tk.NORMAL)
+    
+    def close(self):
+        self.fetch_core.shutdown()
+        self.root.destroy()
+    
+    def _report_fetch_error(self, error_message, error_details=None, status_message="Error: Request failed"):
+        """Show a fetch failure, keeping a cached snapshot visible if one is on screen"""
+        if self.showing_cached:
+            self.output_text.insert(tk.END, "\n")
+            self.display_error(error_message, error_details)
+            self.output_text.see(1.0)
+            self.set_status(f"Offline: showing cached data ({status_message})", "warning")
+        else:
+            self.clear_output()
+            self.display_error(error_message, error_details)
+            self.set_status(status_message, "error")
+    
+    async def _fetch(self, username, password, cache_key):
+        """Fetch and process the portal data; runs on the fetch core's event loop"""
+        try:
+            body = urllib.parse.urlencode({
+                "action": "authenticate",
+                "switch_package": "true",
+                "login": username,
+                "password": password,
+                "policy_accept": "true",
+                "private_policy_accept": "false",
+                "from_ajax": "true",
+                "wispr_mode": "false"
+            })
+            
+            try:
+                transport_name, response_text = await self.transport_selector.post(PORTAL_URL, body)
+            except TransportError as te:
+                error_message, error_details, status_message = te.message, te.details, te.status_message
+                self.call_in_ui(lambda: self._report_fetch_error(error_message, error_details, status_message))
                 return
-
-            # Get the path to the bundled curl executable
-            curl_executable = "curl"
-            if getattr(sys, 'frozen', False):
-
-                if platform.system() == 'Windows':
-                    curl_executable = resource_path(os.path.join("bin", "curl.exe"))
+            
+            try:
+                data = json.loads(response_text)
+                if self.capture_path:
+                    await self.fetch_core.write(capture_response, self.capture_path, data)
+                response_type = classify_response(data)
+                # Check if authentication was successful
+                if response_type == "usage":
+                    self.current_data = data
+                    self.call_in_ui(lambda: self._show_fresh_data(self.display_info, data))
+                    self.call_in_ui(lambda: self.set_status(f"Data fetched successfully via {transport_name}", "success"))
+                    self.call_in_ui(lambda: self.check_alerts(cache_key, data))
+                    await self.fetch_core.write(self.save_state_cache, cache_key, data)
+                elif response_type == "api_error":
+                    # Extract API error message if available
+                    error_msg = data.get("errorMsg", "Authentication failed or no data returned")
+                    self.call_in_ui(lambda: self._report_fetch_error(
+                        f"API Error: {error_msg}", json.dumps(data, indent=2), "Error: API returned an error"
+                    ))
+                elif response_type == "quota_reached":
+                    self.current_data = data
+                    self.call_in_ui(lambda: self._show_fresh_data(self.display_quota_reached_info, data))
+                    self.call_in_ui(lambda: self.set_status("Quota limit reached", "warning"))
+                    self.call_in_ui(lambda: self.check_alerts(cache_key, data))
+                    await self.fetch_core.write(self.save_state_cache, cache_key, data)
                 else:
-                    curl_executable = resource_path(os.path.join("bin", "curl"))
-
-            # Create curl command with the executable path
-            curl_command = [
-                curl_executable,  # Use the bundled curl or system curl
-                "-k",   # Skip certificate validation
-                "-s",   # Silent mode
-                "-X", "POST",
-                "https://internet.stenaline.com/portal_api.php",
-                "-H", "Content-Type: application/x-www-form-urlencoded",
-                "-H", "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                "-d", f"action=authenticate&switch_package=true&login={username}&password={password}&policy_accept=true&private_policy_accept=false&from_ajax=true&wispr_mode=false"
-            ]
-        
-            # Execute curl command - MODIFIED TO HIDE CONSOLE WINDOW
-            # Check if we're on Windows and use the CREATE_NO_WINDOW flag
-            if platform.system() == 'Windows':
-                try:
-                    result = subprocess.run(
-                        curl_command, 
-                        capture_output=True, 
-                        text=True,
-                        creationflags=CREATE_NO_WINDOW 
-                    )
-                except FileNotFoundError:
-                    # Handle the case where curl is not installed
-                    error_message = "CURL command not found. Make sure curl is installed and in your PATH."
-                    self.root.after(0, lambda: self.clear_output())
-                    self.root.after(0, lambda: self.display_error(error_message))
-                    self.root.after(0, lambda: self.set_status("Error: CURL not found", "error"))
-                    self.root.after(0, lambda: self.fetch_btn.configure(state=tk.NORMAL))
-                    return
-            else:
-                # For non-Windows platforms, use the standard call
-                try:
-                    result = subprocess.run(curl_command, capture_output=True, text=True)
-                except FileNotFoundError:
-                    # Handle the case where curl is not installed
-                    error_message = "CURL command not found. Make sure curl is installed and in your PATH."
-                    self.root.after(0, lambda: self.clear_output())
-                    self.root.after(0, lambda: self.display_error(error_message))
-                    self.root.after(0, lambda: self.set_status("Error: CURL not found", "error"))
-                    self.root.after(0, lambda: self.fetch_btn.configure(state=tk.NORMAL))
-                    return
-        
-            if result.returncode == 0 and result.stdout:
-                try:
-                    data = json.loads(result.stdout)
-                    # Check if authentication was successful
-                    if "user" in data and "consumedData" in data["user"]:
-                        self.current_data = data
-                        self.root.after(0, lambda: self.display_info(data))
-                        self.root.after(0, lambda: self.set_status("Data fetched successfully", "success"))
-                    elif "errorMsg" in data:
-                        # Extract API error message if available
-                        error_msg = data.get("errorMsg", "Authentication failed or no data returned")
-                        self.root.after(0, lambda: self.clear_output())
-                        self.root.after(0, lambda: self.display_error(f"API Error: {error_msg}", json.dumps(data, indent=2)))
-                        self.root.after(0, lambda: self.set_status("Error: API returned an error", "error"))
-                    elif "error" in data and data["error"].get("code") == "error_logon_volume-quota-reached-detail":
-                        self.current_data = data
-                        self.root.after(0, lambda: self.display_quota_reached_info(data))
-                        self.root.after(0, lambda: self.set_status("Quota limit reached", "warning"))
-                    else:
-                        error_msg = "Authentication failed or no data returned"
-                        self.root.after(0, lambda: self.clear_output())
-                        self.root.after(0, lambda: self.display_error(error_msg, json.dumps(data, indent=2)))
-                        self.root.after(0, lambda: self.set_status("Error: Authentication failed", "error"))
-                except json.JSONDecodeError as je:
-                    self.root.after(0, lambda: self.clear_output())
-                    self.root.after(0, lambda: self.display_error(
-                        "Error decoding JSON response", 
-                        f"JSON Error: {str(je)}\n\nResponse Content:\n{result.stdout[:500]}...(truncated)"
+                    error_msg = "Authentication failed or no data returned"
+                    self.call_in_ui(lambda: self._report_fetch_error(
+                        error_msg, json.dumps(data, indent=2), "Error: Authentication failed"
                     ))
-                    self.root.after(0, lambda: self.set_status("Error: Invalid response format", "error"))
-            else:
-                self.root.after(0, lambda: self.clear_output())
-                self.root.after(0, lambda: self.display_error(
-                    f"Curl command failed with exit code: {result.returncode}", 
-                    f"STDERR: {result.stderr}\n\nSTDOUT: {result.stdout}"
+            except json.JSONDecodeError as je:
+                error_details = f"JSON Error: {str(je)}\n\nResponse Content:\n{response_text[:500]}...(truncated)"
+                self.call_in_ui(lambda: self._report_fetch_error(
+                    "Error decoding JSON response", error_details, "Error: Invalid response format"
                 ))
-                self.root.after(0, lambda: self.set_status("Error: Request failed", "error"))
         except Exception as e:
             # Get the full traceback for detailed error information
             error_traceback = traceback.format_exc()
+            error_message = f"Error fetching data: {e}"
+            status_message = f"Error: {str(e)[:50]}"
             
-            self.root.after(0, lambda: self.clear_output())
-            self.root.after(0, lambda: self.display_error(
-                f"Error executing curl command: {e}", 
-                error_traceback
-            ))
-            self.root.after(0, lambda: self.set_status(f"Error: {str(e)[:50]}", "error"))
-        finally:
-            # Re-enable the button
-            self.root.after(0, lambda: self.fetch_btn.configure(state=tk.NORMAL))
+            self.call_in_ui(lambda: self._report_fetch_error(error_message, error_traceback, status_message))
+    
+    def check_alerts(self, cache_key, data):
+        """Feed a fresh snapshot to the profile's alert rules and show any alerts that fire"""
+        snapshot = extract_usage(data)
+        if snapshot is None:
+            return
+        
+        try:
+            engine = self.alert_engines.get(cache_key)
+            if engine is None:
+                engine = AlertEngine.from_profile(self.profiles.get(cache_key, {}))
+                self.alert_engines[cache_key] = engine
+            
+            for message in engine.update(snapshot):
+                self.root.bell()
+                AlertNotification(self.root, message)
+                self.set_status(message, "warning")
+        except Exception as e:
+            error_details = traceback.format_exc()
+            self.display_error(f"Failed to evaluate usage alerts: {e}", error_details)
+    
+    def _show_fresh_data(self, display_method, data):
+        self.showing_cached = False
+        display_method(data)
+    
+    def get_cache_key(self):
+        """Cached snapshots are stored per profile, falling back to the username"""
+        return self.profile_var.get() or self.username_var.get()
+    
+    def load_state_cache(self):
+        try:
+            if os.path.exists('last_state.json'):
+                with open('last_state.json', 'r') as f:
+                    return json.load(f)
+            return {}
+        except Exception as e:
+            error_message = f"Failed to load cached data: {e}"
+            error_details = traceback.format_exc()
+            self.call_in_ui(lambda: self.display_error(error_message, error_details))
+            return {}
+    
+    def save_state_cache(self, cache_key, data):
+        """Persist the last successful response so it can be shown at the next launch"""
+        if not cache_key:
+            return
+        
+        try:
+            cache = self.load_state_cache()
+            cache.setdefault('snapshots', {})[cache_key] = {
+                'saved_at': time.time(),
+                'data': data
+            }
+            cache['last_profile'] = cache_key
+            
+            # Write to a temporary file first so a crash never leaves a truncated cache
+            with open('last_state.json.tmp', 'w') as f:
+                json.dump(cache, f, separators=(',', ':'))
+            os.replace('last_state.json.tmp', 'last_state.json')
+        except Exception as e:
+            error_message = f"Failed to cache data: {e}"
+            error_details = traceback.format_exc()
+            self.call_in_ui(lambda: self.display_error(error_message, error_details))
+    
+    def start_startup_refresh(self):
+        """Load the last cached snapshot and start refreshing it before the widgets exist.
+        
+        Returns the snapshot, or None if nothing was cached.
+        """
+        cache = self.load_state_cache()
+        cache_key = cache.get('last_profile')
+        snapshot = cache.get('snapshots', {}).get(cache_key)
+        if not snapshot or not snapshot.get('data'):
+            return None
+        
+        if cache_key in self.profiles:
+            profile = self.profiles[cache_key]
+            self.profile_var.set(cache_key)
+            self.username_var.set(profile.get('username', ''))
+            self.password_var.set(profile.get('password', ''))
+        
+        snapshot['refreshing'] = bool(self.username_var.get() and self.password_var.get())
+        if snapshot['refreshing']:
+            self._start_fetch(self.username_var.get(), self.password_var.get(), cache_key)
+        return snapshot
+    
+    def restore_cached_state(self, snapshot):
+        """Display the last cached snapshot as stale data while the startup refresh runs"""
+        if snapshot is None:
+            self.display_welcome_message()
+            return
+        
+        saved_at = snapshot.get('saved_at', 0)
+        self.display_cached_snapshot(snapshot['data'], saved_at)
+        
+        if snapshot['refreshing']:
+            self.fetch_btn.configure(state=tk.DISABLED)
+            self.set_status("Showing cached data. Refreshing...", "warning")
+        else:
+            self.set_status(f"Showing cached data from {self.format_age(time.time() - saved_at)} ago", "warning")
+    
+    def display_cached_snapshot(self, data, saved_at):
+        updated_at = datetime.fromtimestamp(saved_at)
+        if "error" in data:
+            self.display_quota_reached_info(data, updated_at=updated_at)
+        else:
+            self.display_info(data, updated_at=updated_at)
+        
+        self.output_text.tag_configure("stale", foreground=COLORS["warning"], font=("Segoe UI", 10, "bold"))
+        self.output_text.insert(1.0, f"CACHED DATA - last updated {self.format_age(time.time() - saved_at)} ago\n\n", "stale")
+        self.output_text.see(1.0)
+        self.showing_cached = True
+    
+    def format_age(self, seconds):
+        seconds = max(0, int(seconds))
+        if seconds < 60:
+            return f"{seconds} seconds"
+        if seconds < 3600:
+            return f"{seconds // 60} minutes"
+        if seconds < 86400:
+            return f"{seconds // 3600} hours, {(seconds % 3600) // 60} minutes"
+        return f"{seconds // 86400} days, {(seconds % 86400) // 3600} hours"
     
     def format_bytes(self, bytes_value):
         try:
@@ -528,7 +1251,7 @@ class StenaInternetMonitor:
             self.display_error(f"Error formatting bytes: {e}", f"Value was: {bytes_value}")
             return "Error"
     
-    def display_quota_reached_info(self, data):
+    def display_quota_reached_info(self, data, updated_at=None):
         try:
             # Clear previous output
             self.clear_output()
@@ -633,7 +1356,8 @@ class StenaInternetMonitor:
             self.output_text.insert(tk.END, f"{renewal_time.strftime('%Y-%m-%d %H:%M:%S')}\n\n", "value")
             
             # Footer
-            self.output_text.insert(tk.END, f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n", "footer")
+            updated_at = updated_at or datetime.now()
+            self.output_text.insert(tk.END, f"Last updated: {updated_at.strftime('%Y-%m-%d %H:%M:%S')}\n", "footer")
             
             # Scroll to the top to see all information
             self.output_text.see(1.0)
@@ -646,7 +1370,7 @@ class StenaInternetMonitor:
                 f"Traceback:\n{error_traceback}\n\nData received:\n{json.dumps(data, indent=2)[:500]}...(truncated)"
             )
     
-    def display_info(self, data):
+    def display_info(self, data, updated_at=None):
         if not data:
             self.output_text.insert(tk.END, "No data available\n")
             return
@@ -680,7 +1404,7 @@ class StenaInternetMonitor:
                 return
             
             # Get quota information
-            extra_data = consumed.get("extra", {}).get("value", [])
+            extra_data = (consumed.get("extra") or {}).get("value") or []
             quota_info = None
             for item in extra_data:
                 if item.get("isSumQuota") and item.get("isDisconnectQuota"):
@@ -767,7 +1491,8 @@ class StenaInternetMonitor:
             self.output_text.insert(tk.END, f"{renewal_time.strftime('%Y-%m-%d %H:%M:%S')}\n\n", "value")
             
             # Footer
-            self.output_text.insert(tk.END, f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n", "footer")
+            updated_at = updated_at or datetime.now()
+            self.output_text.insert(tk.END, f"Last updated: {updated_at.strftime('%Y-%m-%d %H:%M:%S')}\n", "footer")
             
             # Scroll to the top to see all information
             self.output_text.see(1.0)
@@ -786,42 +1511,52 @@ class StenaInternetMonitor:
             return
         
         try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            username = self.username_var.get()
-            
-            # Extract data based on response type
-            if "user" in self.current_data and "consumedData" in self.current_data["user"]:
-                # Normal response
-                consumed = self.current_data.get("user", {}).get("consumedData", {})
-                download_bytes = int(consumed.get("download", {}).get("value", 0))
-                upload_bytes = int(consumed.get("upload", {}).get("value", 0))
-            elif "error" in self.current_data and self.current_data["error"].get("code") == "error_logon_volume-quota-reached-detail":
-                # Quota-reached response
-                error_value = self.current_data.get("error", {}).get("value", {})
-                download_bytes = int(error_value.get("consumedDown", 0))
-                upload_bytes = int(error_value.get("consumedUp", 0))
-            else:
+            message = self.record_history()
+            if message is None:
                 messagebox.showerror("Error", "Unrecognized data format. Cannot save history.")
                 return
             
-            # Check if file exists
-            file_exists = os.path.isfile('usage_history.csv')
-            
-            with open('usage_history.csv', 'a') as f:
-                # Write header if file doesn't exist
-                if not file_exists:
-                    f.write("Timestamp,Username,Download (MB),Upload (MB),Total (MB),Status\n")
-                
-                # Write data with status
-                status = "Quota Reached" if "error" in self.current_data else "Active"
-                f.write(f"{timestamp},{username},{download_bytes/1024/1024:.2f},{upload_bytes/1024/1024:.2f},{(download_bytes+upload_bytes)/1024/1024:.2f},{status}\n")
-            
-            self.set_status("Usage data saved to usage_history.csv", "success")
-            messagebox.showinfo("Success", "Usage data saved to usage_history.csv")
+            self.set_status(message, "success")
+            messagebox.showinfo("Success", message)
         except Exception as e:
             self.set_status("Error saving data", "error")
             messagebox.showerror("Error", f"Error saving usage data: {e}")
     
+    def record_history(self, path='usage_history.csv'):
+        """Write the current data to the history file.
+        
+        Returns a status message, or None if the data format is not recognised.
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        username = self.username_var.get()
+        
+        # Extract data based on response type
+        response_type = classify_response(self.current_data)
+        if response_type == "usage":
+            # Normal response
+            consumed = self.current_data.get("user", {}).get("consumedData", {})
+            download_bytes = int(consumed.get("download", {}).get("value", 0))
+            upload_bytes = int(consumed.get("upload", {}).get("value", 0))
+        elif response_type == "quota_reached":
+            # Quota-reached response
+            error_value = self.current_data.get("error", {}).get("value", {})
+            download_bytes = int(error_value.get("consumedDown", 0))
+            upload_bytes = int(error_value.get("consumedUp", 0))
+        else:
+            return None
+        
+        status = "Quota Reached" if "error" in self.current_data else "Active"
+        reading = [
+            f"{download_bytes/1024/1024:.2f}",
+            f"{upload_bytes/1024/1024:.2f}",
+            f"{(download_bytes+upload_bytes)/1024/1024:.2f}",
+            status
+        ]
+        
+        if append_history_sample(path, timestamp, username, reading):
+            return f"Usage data saved to {path}"
+        return "Usage unchanged since last save, history record extended"
+    
     def clear_output(self):
         self.output_text.delete(1.0, tk.END)
 
@@ -844,13 +1579,367 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
+def classify_response(data):
+    """Return the kind of portal response: usage, quota_reached, api_error or unknown"""
+    if "user" in data and "consumedData" in data["user"]:
+        return "usage"
+    if "errorMsg" in data:
+        return "api_error"
+    if "error" in data and data["error"].get("code") == "error_logon_volume-quota-reached-detail":
+        return "quota_reached"
+    return "unknown"
+
+def extract_usage(data):
+    """Reduce a usage or quota-reached response to the values the alert rules need.
+    
+    Returns None when the response has no usable consumption data. Both response types are
+    stamped with the local clock: quota-reached responses carry no portal timestamp, and
+    mixing the two clocks would distort the rates the rules compute between samples.
+    """
+    try:
+        response_type = classify_response(data)
+        if response_type == "usage":
+            consumed = data["user"]["consumedData"]
+            used = int(consumed.get("download", {}).get("value", 0)) + int(consumed.get("upload", {}).get("value", 0))
+            quota = available = None
+            for item in (consumed.get("extra") or {}).get("value") or []:
+                if item.get("isSumQuota") and item.get("isDisconnectQuota"):
+                    quota = item.get("total", {}).get("upload")
+                    available = item.get("available", {}).get("upload")
+                    break
+            renew_timestamp = int(consumed.get("renewTimestamp", {}).get("value", 0))
+        elif response_type == "quota_reached":
+            error_value = data["error"].get("value") or {}
+            used = int(error_value.get("consumedDown", 0)) + int(error_value.get("consumedUp", 0))
+            quota = int(error_value.get("thresoldUp", 0)) or None
+            available = 0
+            renew_timestamp = int(error_value.get("renewTimeStamp", 0))
+        else:
+            return None
+    except (ValueError, TypeError, AttributeError):
+        return None
+    
+    return {
+        'timestamp': time.time(),
+        'quota_reached': response_type == "quota_reached",
+        'used': used,
+        'quota': quota,
+        'available': available,
+        'renew_timestamp': renew_timestamp
+    }
+
+def redact_response(data, redact=False):
+    """Return a copy of a portal response with identifying fields replaced"""
+    if isinstance(data, dict):
+        return {key: redact_response(value, redact or key.lower() in REDACTED_KEYS) for key, value in data.items()}
+    if isinstance(data, list):
+        return [redact_response(item, redact) for item in data]
+    return "REDACTED" if redact else data
+
+def capture_response(path, data):
+    """Append a redacted portal response to a replay corpus (one JSON object per line)"""
+    case = {
+        'name': f"{classify_response(data)}-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
+        'response': redact_response(data)
+    }
+    with open(path, 'a') as f:
+        f.write(json.dumps(case, separators=(',', ':')) + "\n")
+
+def upgrade_history_file(path):
+    """Rewrite a history file using the old six-column header in the current format"""
+    with open(path, 'r', newline='', encoding='utf-8', errors='replace') as f:
+        rows = list(csv.reader(f))
+    
+    with open(path + '.tmp', 'w', newline='', encoding='utf-8') as f:
+        f.write(HISTORY_HEADER + os.linesep)
+        for row in rows[1:]:
+            if row:
+                # Every legacy row is a single sample
+                f.write(",".join(row + ["1", row[0]]) + os.linesep)
+    os.replace(path + '.tmp', path)
+
+def append_history_sample(path, timestamp, username, reading):
+    """Record a sample, collapsing it into the user's previous record when nothing changed.
+    
+    reading holds the formatted download, upload, total and status fields. When the
+    user's last record has the same reading, its sample count and last-seen time are
+    updated instead of writing a new row. That record is usually the last line; if
+    other users have written since, the rows after it are moved along with it, unless
+    that would mean rewriting more than HISTORY_REWRITE_LIMIT bytes.
+    Returns True if a new row was written.
+    """
+    if os.path.isfile(path):
+        with open(path, 'r', newline='', encoding='utf-8', errors='replace') as f:
+            header = f.readline().strip()
+        if header == LEGACY_HISTORY_HEADER:
+            upgrade_history_file(path)
+        
+        # Validate the index before writing so a stale one is rebuilt, not extended
+        index = HistoryIndex.load(path)
+        offset = index.last_rows.get(username)
+        if offset is not None:
+            with open(path, 'r+b') as f:
+                f.seek(offset)
+                last_line = f.readline()
+                last_row = next(csv.reader([last_line.decode('utf-8', errors='replace')]), [])
+                if len(last_row) == 8 and last_row[1] == username and last_row[2:6] == reading:
+                    following = f.read(HISTORY_REWRITE_LIMIT + 1)
+                    if len(following) <= HISTORY_REWRITE_LIMIT:
+                        samples = int(last_row[6]) + 1
+                        line_ending = b"\r\n" if last_line.endswith(b"\r\n") else b"\n"
+                        record = ",".join(last_row[:6] + [str(samples), timestamp]).encode("utf-8") + line_ending
+                        f.seek(offset)
+                        f.write(record + following)
+                        f.truncate()
+                        # The record keeps its offset and first timestamp; later rows move
+                        index.shift(offset, len(record) - len(last_line))
+                        index.saw(offset, timestamp)
+                        index.save()
+                        return False
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(HISTORY_HEADER + "\n")
+        index = HistoryIndex.load(path)
+    
+    offset = os.path.getsize(path)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(",".join([timestamp, username] + reading + ["1", timestamp]) + "\n")
+    index.add_row(offset, username, timestamp)
+    index.save()
+    return True
+
+def read_history(path):
+    """Yield every history record as a dict, accepting both the legacy and run-length format"""
+    with open(path, 'r', newline='', encoding='utf-8', errors='replace') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) < 6:
+                continue
+            try:
+                yield parse_history_row(row)
+            except ValueError:
+                continue
+
+def iter_history_samples(path):
+    """Reconstruct the sampled time series from run-length encoded history records.
+    
+    Each run expands to its first and last observation, which carry the same
+    reading, so the counter values are known exactly at every point in time.
+    Rows are written in order of their first sample, but a run extended in place ends
+    after rows below it, so run ends are held back and merged in by timestamp.
+    """
+    ends = []
+    for position, record in enumerate(read_history(path)):
+        while ends and ends[0][0] <= record['timestamp']:
+            yield heapq.heappop(ends)[2]
+        yield record
+        if record['samples'] > 1:
+            heapq.heappush(ends, (record['last_seen'], position, dict(record, timestamp=record['last_seen'])))
+    while ends:
+        yield heapq.heappop(ends)[2]
+
+def parse_history_row(row):
+    """Turn a history CSV row into a dict, accepting both the legacy and run-length format"""
+    return {
+        'timestamp': row[0],
+        'username': row[1],
+        'download_mb': float(row[2]),
+        'upload_mb': float(row[3]),
+        'total_mb': float(row[4]),
+        'status': row[5],
+        'samples': int(row[6]) if len(row) > 6 else 1,
+        'last_seen': row[7] if len(row) > 7 else row[0]
+    }
+
+def iter_history_lines(f):
+    """Yield (offset, line) for each non-empty line from the current position of a binary file"""
+    while True:
+        offset = f.tell()
+        line = f.readline()
+        if not line:
+            return
+        if line.strip():
+            yield offset, line
+
+class HistoryIndex:
+    """Sparse index of a history file holding the byte offset of every Kth row.
+    
+    Each entry also holds the latest Last Seen of any row up to the end of its block. A
+    run extended in place can end long after the rows written below it, so this running
+    maximum, not the row order, tells where samples after a given time can start.
+    
+    It also records the offset of each user's last row, so a save can find the run it may
+    extend without scanning the file. It is stored next to the file as <name>.idx together with the size and modification
+    time of the file it describes, and rebuilt with a full scan when those do not match.
+    """
+    version = 2  # Bumped when the format of the entries changes
+    
+    def __init__(self, path, interval=HISTORY_INDEX_INTERVAL):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.interval = interval
+        self.rows = 0
+        self.entries = []  # [offset, latest last seen so far]
+        self.seen = []  # Second column of the entries, kept for bisecting in since()
+        self.last_rows = {}
+    
+    @classmethod
+    def load(cls, path, interval=HISTORY_INDEX_INTERVAL):
+        index = cls(path, interval)
+        stat = os.stat(path)
+        try:
+            with open(index.index_path, 'r') as f:
+                data = json.load(f)
+            if ((data['version'], data['size'], data['mtime_ns'], data['interval'])
+                    == (cls.version, stat.st_size, stat.st_mtime_ns, interval)):
+                index.rows = data['rows']
+                index.entries = data['entries']
+                index.seen = [entry[1] for entry in index.entries]
+                index.last_rows = data['last_rows']
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        # Missing, unreadable or describing another version of the file
+        index.rebuild()
+        index.save()
+        return index
+    
+    def rebuild(self):
+        self.rows = 0
+        self.entries = []
+        self.seen = []
+        self.last_rows = {}
+        with open(self.path, 'rb') as f:
+            f.readline()  # Header
+            for offset, line in iter_history_lines(f):
+                row = next(csv.reader([line.decode('utf-8', errors='replace')]), [])
+                if len(row) < 6:
+                    # Keeps the row count right without putting junk into the index
+                    self.add_row(offset, None, None)
+                    continue
+                self.add_row(offset, row[1], row[7] if len(row) > 7 else row[0])
+    
+    def add_row(self, offset, username, last_seen):
+        if self.rows % self.interval == 0:
+            previous = self.seen[-1] if self.seen else ""
+            self.entries.append([offset, previous])
+            self.seen.append(previous)
+        if username is not None:
+            self.last_rows[username] = offset
+        if last_seen is not None:
+            self.saw(offset, last_seen)
+        self.rows += 1
+    
+    def saw(self, offset, last_seen):
+        """Note a sample at last_seen in the row at offset, raising the running maximum from its entry on"""
+        for position in range(len(self.entries) - 1, -1, -1):
+            entry = self.entries[position]
+            if entry[1] < last_seen:
+                entry[1] = self.seen[position] = last_seen
+            if entry[0] <= offset:
+                break
+    
+    def shift(self, after, delta):
+        """Move every offset past after by delta bytes, following an in-place rewrite"""
+        if delta == 0:
+            return
+        for entry in self.entries:
+            if entry[0] > after:
+                entry[0] += delta
+        for username, offset in self.last_rows.items():
+            if offset > after:
+                self.last_rows[username] = offset + delta
+    
+    def save(self):
+        """Write the index, recording the current size and modification time of the file"""
+        stat = os.stat(self.path)
+        data = {
+            'version': self.version,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'interval': self.interval,
+            'rows': self.rows,
+            'entries': self.entries,
+            'last_rows': self.last_rows
+        }
+        with open(self.index_path + '.tmp', 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(self.index_path + '.tmp', self.index_path)
+    
+    def _read_from(self, entry, skip=0):
+        """Yield the records from an index entry on, after skipping the first skip rows.
+        
+        Malformed rows are left out like read_history does, but still count as rows.
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(self.entries[entry][0])
+            for position, (_, line) in enumerate(iter_history_lines(f)):
+                if position < skip:
+                    continue
+                row = next(csv.reader([line.decode('utf-8', errors='replace')]), [])
+                if len(row) < 6:
+                    continue
+                try:
+                    yield parse_history_row(row)
+                except ValueError:
+                    continue
+    
+    def tail(self, count):
+        """Yield the count records with the latest samples, ordered by their last sample.
+        
+        Reads the last count + K rows, plus any runs before them that were extended later.
+        """
+        if not self.entries or count <= 0:
+            return
+        first = max(0, self.rows - count)
+        entry = first // self.interval
+        recent = list(self._read_from(entry, first - entry * self.interval))
+        
+        # Every record ending before the oldest of the last count rows has count newer ones
+        cutoff = min(record['last_seen'] for record in recent) if len(recent) >= count else ""
+        records = sorted(self.since(cutoff), key=lambda record: record['last_seen'])
+        yield from records[-count:]
+    
+    def since(self, timestamp):
+        """Yield the records with samples at or after timestamp ("%Y-%m-%d %H:%M:%S" or datetime)"""
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Every block before the first entry whose running maximum reaches the timestamp
+        # ended before it, including runs that were extended in place
+        entry = bisect.bisect_left(self.seen, timestamp)
+        if entry == len(self.entries):
+            return
+        for record in self._read_from(entry):
+            if record['last_seen'] >= timestamp:
+                yield record
+
+def tail_history(path, count):
+    """Return the last count history records without reading the whole file"""
+    return list(HistoryIndex.load(path).tail(count))
+
+def history_since(path, timestamp):
+    """Return the history records with samples at or after timestamp without reading the whole file"""
+    return list(HistoryIndex.load(path).since(timestamp))
+
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="KERRY the FERRY Internet Monitor")
+    parser.add_argument("--capture", metavar="FILE", help="append redacted portal responses to a replay corpus")
+    parser.add_argument("--profile-startup", action="store_true", help="print how long each startup phase takes")
+    args = parser.parse_args()
+    profiler = StartupProfiler(MODULE_START, verbose=args.profile_startup)
+    profiler.mark("imports")
+    
     root = tk.Tk()
     try:
         icon_path = resource_path("icon.ico")
         root.iconbitmap(icon_path)
     except Exception as e:
         print(f"Could not load icon: {e}")
-    app = StenaInternetMonitor(root)
+    profiler.mark("window")
+    app = StenaInternetMonitor(root, profiler, capture_path=args.capture)
     center_window(root)
     root.mainloop()
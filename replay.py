@@ -0,0 +1,228 @@
+"""Replay recorded portal responses through the parse, render and history pipeline.
+
+Responses are captured from a live session with ``python main.py --capture corpus.jsonl``
+(identifying fields are redacted). This script replays them offline, together with a set of
+built-in edge cases and optional synthetic large payloads, and reports timings per case.
+
+    python replay.py corpus.jsonl --synthetic 1000,100000 --baseline replay_baseline.json
+
+With --baseline the run fails when any case is slower than the recorded baseline by more
+than the tolerance plus a small absolute slack, or when all cases together are slower than
+the tolerance allows. Use --update-baseline to record new timings.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tkinter as tk
+from datetime import datetime
+
+from main import StenaInternetMonitor, classify_response
+
+
+def usage_response(download=524288000, upload=104857600, extra=None, renew=None, timestamp=None):
+    """Build a normal usage response in the portal's format"""
+    now = int(datetime.now().timestamp())
+    consumed = {
+        "download": {"value": download},
+        "upload": {"value": upload},
+        "renewTimestamp": {"value": now + 86400 if renew is None else renew},
+        "timestamp": {"value": now if timestamp is None else timestamp}
+    }
+    if extra is not None:
+        consumed["extra"] = {"value": extra}
+    return {
+        "user": {
+            "login": {"value": "REDACTED"},
+            "profile": {"value": "Crew"},
+            "consumedData": consumed
+        }
+    }
+
+
+def quota_item(total=2147483648, available=536870912):
+    return {"isSumQuota": True, "isDisconnectQuota": True,
+            "total": {"upload": total}, "available": {"upload": available}}
+
+
+def quota_reached_response(threshold_down=-1):
+    return {
+        "error": {
+            "code": "error_logon_volume-quota-reached-detail",
+            "value": {
+                "consumedUp": 1073741824,
+                "consumedDown": 1181116006,
+                "thresoldUp": 2147483648,
+                "thresoldDown": threshold_down,
+                "renewTimeStamp": int(datetime.now().timestamp()) + 3600
+            }
+        }
+    }
+
+
+def builtin_cases():
+    """Edge cases of the rendering code that cannot be reproduced on demand against the portal"""
+    return [
+        {"name": "usage", "response": usage_response(extra=[quota_item()]), "expect_error": False},
+        {"name": "usage-high", "response": usage_response(extra=[quota_item(available=104857600)]), "expect_error": False},
+        {"name": "missing-extra", "response": usage_response(), "expect_error": False},
+        {"name": "null-extra", "response": dict(usage_response(), user=dict(
+            usage_response()["user"], consumedData=dict(usage_response()["user"]["consumedData"], extra=None))),
+            "expect_error": False},
+        {"name": "bad-timestamps", "response": usage_response(extra=[quota_item()], renew="soon", timestamp="now"),
+         "expect_error": True},
+        {"name": "quota-negative-threshold", "response": quota_reached_response(threshold_down=-1), "expect_error": False},
+        {"name": "quota-missing-details", "response": {"error": {"code": "error_logon_volume-quota-reached-detail"}},
+         "expect_error": True},
+        {"name": "error-msg", "response": {"errorMsg": "Invalid credentials"}, "expect_error": True},
+        {"name": "unknown", "response": {"status": "ok"}, "expect_error": True}
+    ]
+
+
+def synthetic_cases(sizes):
+    """Usage responses with huge extra arrays; the matching quota item is placed last"""
+    cases = []
+    for size in sizes:
+        extra = [{"isSumQuota": False, "isDisconnectQuota": True, "total": {"upload": i}} for i in range(size - 1)]
+        extra.append(quota_item())
+        cases.append({"name": f"synthetic-extra-{size}", "response": usage_response(extra=extra), "expect_error": False})
+    return cases
+
+
+def load_corpus(path):
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def render_response(app, data):
+    """Route a response the same way a completed fetch does, but synchronously"""
+    app.current_data = None
+    app.showing_cached = False
+    response_type = classify_response(data)
+    if response_type == "usage":
+        app.current_data = data
+        app.display_info(data)
+    elif response_type == "quota_reached":
+        app.current_data = data
+        app.display_quota_reached_info(data)
+    elif response_type == "api_error":
+        app._report_fetch_error(f"API Error: {data.get('errorMsg')}", json.dumps(data, indent=2))
+    else:
+        app._report_fetch_error("Authentication failed or no data returned", json.dumps(data, indent=2))
+
+
+def run_case(app, case, iterations, history_path):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render_response(app, case["response"])
+        app.root.update_idletasks()
+        if app.current_data:
+            app.record_history(history_path)
+        timings.append(time.perf_counter() - start)
+
+    rendered_error = bool(app.output_text.tag_ranges("error"))
+    return {
+        "median": statistics.median(timings),
+        "max": max(timings),
+        "rendered_error": rendered_error
+    }
+
+
+def run_cases(cases, args, baseline, work_dir):
+    """Replay every case, print a line per case and return (results, failed case names)"""
+    root = tk.Tk()
+    root.withdraw()
+    app = StenaInternetMonitor(root)
+    app.username_var.set("replay")
+
+    results = {}
+    failures = []
+    slack = args.slack_ms / 1000
+    print(f"{'Case':<32} {'Median (ms)':>12} {'Max (ms)':>10} {'Cases/s':>10}  Result")
+    try:
+        for index, case in enumerate(cases):
+            history_path = os.path.join(work_dir, f"history_{index}.csv")
+            result = run_case(app, case, args.iterations, history_path)
+            results[case["name"]] = {"median": result["median"]}
+
+            verdict = "ok"
+            expect_error = case.get("expect_error")
+            if expect_error is not None and expect_error != result["rendered_error"]:
+                verdict = "unexpected error" if result["rendered_error"] else "missing error"
+
+            reference = baseline.get(case["name"], {}).get("median")
+            if reference and result["median"] > reference * (1 + args.tolerance) + slack:
+                verdict = f"slower than baseline ({reference * 1000:.2f} ms)"
+
+            if verdict != "ok":
+                failures.append(case["name"])
+
+            print(f"{case['name']:<32} {result['median'] * 1000:>12.2f} {result['max'] * 1000:>10.2f} "
+                  f"{1 / result['median']:>10.0f}  {verdict}")
+    finally:
+        # Stops the app's fetch loop as well as destroying the window
+        app.close()
+    return results, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay portal responses through the render and history pipeline")
+    parser.add_argument("corpus", nargs="*", help="corpus files written by main.py --capture")
+    parser.add_argument("--iterations", type=int, default=20, help="replays per case (default: 20)")
+    parser.add_argument("--synthetic", default="", help="comma separated sizes of synthetic extra arrays")
+    parser.add_argument("--baseline", help="JSON file with baseline timings to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run's timings to the baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing (default: 0.25)")
+    parser.add_argument("--slack-ms", type=float, default=2.0,
+                        help="absolute slowdown a single case is always allowed, so timing noise on "
+                             "sub-millisecond cases does not fail the run (default: 2.0)")
+    args = parser.parse_args()
+
+    cases = builtin_cases()
+    for path in args.corpus:
+        cases.extend(load_corpus(path))
+    if args.synthetic:
+        cases.extend(synthetic_cases(int(size) for size in args.synthetic.split(",")))
+
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    # Run inside a scratch directory so the app never touches real profiles, cache or history
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="kerry_replay_") as work_dir:
+        os.chdir(work_dir)
+        try:
+            results, failures = run_cases(cases, args, baseline, work_dir)
+        finally:
+            os.chdir(original_dir)
+
+    # Per-case checks allow for noise; the total catches a general slowdown across many small cases
+    compared = [name for name in results if baseline.get(name, {}).get("median")]
+    if compared:
+        total = sum(results[name]["median"] for name in compared)
+        reference = sum(baseline[name]["median"] for name in compared)
+        print(f"\nTotal median time of {len(compared)} baseline cases: {total * 1000:.2f} ms "
+              f"(baseline {reference * 1000:.2f} ms)")
+        if total > reference * (1 + args.tolerance):
+            failures.append("total throughput")
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+
+    if failures:
+        print(f"\n{len(failures)} case(s) failed: {', '.join(failures)}")
+        return 1
+    print(f"\nAll {len(cases)} cases passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())